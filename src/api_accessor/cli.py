@@ -0,0 +1,193 @@
+"""Command line entry point for the Pluggy sync tooling.
+
+Heavy modules (requests, tenacity, pandas, dotenv) are imported inside the
+subcommands that need them, so short commands start quickly.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from typing import TYPE_CHECKING, Any, Iterable, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from .facade import PluggyFacade
+
+logger = logging.getLogger(__name__)
+
+
+def get_client_info() -> Tuple[str, str]:
+    client_id = os.getenv("CLIENT_ID")
+    client_secret = os.getenv("CLIENT_SECRET")
+
+    if not client_id or not client_secret:
+        raise RuntimeError("ClientID or ClientSecret not found.")
+
+    return client_id, client_secret
+
+
+def _build_facade() -> "PluggyFacade":
+    from dotenv import load_dotenv
+
+    from . import facade
+
+    load_dotenv()
+    try:
+        client_id, client_secret = get_client_info()
+    except RuntimeError:
+        logger.error("Please set the CLIENT_ID and CLIENT_SECRET in .env")
+        raise SystemExit(1)
+    return facade.PluggyFacade(client_id, client_secret)
+
+
+def _wait_for_item(
+    pluggy: "PluggyFacade", item_id: str, credentials: dict, connector: dict
+) -> None:
+    from .status import ItemStatus, TransientExecutionStatus
+
+    # TODO: moving this to a webhook is a much better idea
+    logger.info("Waiting for item to be updated.")
+    while True:
+        item = pluggy.get_item_detail(item_id)
+        status = item.get("status", "")
+        execution_status = item.get("executionStatus", "")
+
+        logger.info(f"Item id: {item_id}")
+        logger.info(f"Item status: {status}")
+        logger.info(f"Execution status: {execution_status}")
+
+        if execution_status.upper() in TransientExecutionStatus.__members__:
+            logger.info(TransientExecutionStatus[execution_status.upper()].value)
+
+        match status:
+            case ItemStatus.WAITING_USER_INPUT.name:
+                # This here is a good candidate for a webhook, we need to wait for the user to input the MFA
+                # When a success happens, we can then have access to the transactions, bank_info and save them
+                oauth_url = item.get("parameter", {}).get("data")
+                instructions = item.get("parameter", {}).get("instructions")
+
+                logger.info(f"Instructions: {instructions}")
+
+                if oauth_url:
+                    logger.info(oauth_url)
+
+                input("Press Enter to continue...")
+            case ItemStatus.UPDATED.name:
+                logger.info("Completed!")
+                return
+            case ItemStatus.LOGIN_ERROR.name | ItemStatus.OUTDATED.name:
+                logger.error(f"{ItemStatus[status].value}")
+                logger.info("Updating item and retrying...")
+                pluggy.update_item_detail(item_id, credentials, connector)
+                input("Press Enter to continue...")
+            case _:
+                logger.info("Waiting for item to be updated.")
+                time.sleep(5)
+
+
+def _export_credit_card_transactions(
+    pluggy: "PluggyFacade", item_id: str, file_path: str, format: str
+) -> int:
+    accounts = pluggy.get_account_list(item_id)
+    credit_card_account = pluggy._find_attribute(accounts, "type", "credit")
+    if not credit_card_account:
+        logger.error("No credit card account found.")
+        return 1
+
+    transactions = pluggy.get_all_transactions(credit_card_account.get("id"))
+    pluggy.data_handler.save_transactions_as(
+        transactions, format=format, file_path=file_path
+    )
+    logger.info(f"Saved {len(transactions)} transactions to {file_path}.{format}")
+    return 0
+
+
+def sync(args: argparse.Namespace) -> int:
+    pluggy = _build_facade()
+    credentials = {"cpf": os.getenv("CPF")}
+    connector = pluggy.fetch_and_find_connector(
+        connector_name=args.connector, open_finance=True
+    )
+
+    logger.info("Creating item")
+    item = pluggy.create_item_detail(credentials, connector=connector)
+    item_id = item.get("id", "")
+
+    _wait_for_item(pluggy, item_id, credentials, connector)
+    logger.info(f"Item created with ID: {item_id}")
+
+    return _export_credit_card_transactions(pluggy, item_id, args.output, args.format)
+
+
+def status(args: argparse.Namespace) -> int:
+    pluggy = _build_facade()
+    item = pluggy.get_item_detail(args.item_id)
+    print(f"{item.get('status', '')}\t{item.get('executionStatus', '')}")
+    return 0
+
+
+def connectors(args: argparse.Namespace) -> int:
+    pluggy = _build_facade()
+    connector_list: Iterable[dict[str, Any]] = (
+        pluggy.get_connector_list(args.country, args.open_finance) or []
+    )
+    for connector in connector_list:
+        print(f"{connector.get('id')}\t{connector.get('name')}")
+    return 0
+
+
+def export(args: argparse.Namespace) -> int:
+    pluggy = _build_facade()
+    return _export_credit_card_transactions(
+        pluggy, args.item_id, args.output, args.format
+    )
+
+
+def _add_output_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--output", default="last_year_transactions")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="pluggy")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    sync_parser = subparsers.add_parser(
+        "sync", help="Connect an item and export its transactions."
+    )
+    sync_parser.add_argument("--connector", default="nubank")
+    _add_output_arguments(sync_parser)
+    sync_parser.set_defaults(handler=sync)
+
+    status_parser = subparsers.add_parser("status", help="Show an item's status.")
+    status_parser.add_argument("item_id")
+    status_parser.set_defaults(handler=status)
+
+    connectors_parser = subparsers.add_parser("connectors", help="List connectors.")
+    connectors_parser.add_argument("--country", default="BR")
+    connectors_parser.add_argument(
+        "--no-open-finance", dest="open_finance", action="store_false"
+    )
+    connectors_parser.set_defaults(handler=connectors)
+
+    export_parser = subparsers.add_parser(
+        "export", help="Export an item's credit card transactions."
+    )
+    export_parser.add_argument("item_id")
+    _add_output_arguments(export_parser)
+    export_parser.set_defaults(handler=export)
+
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,11 @@
-from typing import Any
-from data_handler import PluggyDataHandler
-from pluggy_api import PluggyApi
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Hashable, Iterable, NamedTuple, TypeVar
+from .pluggy_api import PluggyApi
 import re
 
+if TYPE_CHECKING:
+    from .data_handler import PluggyDataHandler
+
 
 class ConnectionError(Exception):
     "The connection failed."
@@ -16,15 +19,35 @@ class MissingCredentialError(Exception):
     pass
 
 
+class CredentialValidator(NamedTuple):
+    name: str
+    pattern: re.Pattern[str] | None
+    optional: bool
+
+
 API_URL = "https://api.pluggy.ai"
 
+IdT = TypeVar("IdT", bound=Hashable)
+ResultT = TypeVar("ResultT")
+
 
 class PluggyFacade:
     def __init__(self, client_id: str, client_secret: str, api_url: str = API_URL):
         self.api = PluggyApi(client_id, client_secret, api_url)
-        self.data_handler = PluggyDataHandler()
+        self._data_handler: "PluggyDataHandler | None" = None
         # simple cache
         self._connectors: dict | None = None
+        # compiled credential validators per connector id, reset with the connectors
+        self._credential_validators: dict[Any, list[CredentialValidator]] = {}
+
+    @property
+    def data_handler(self) -> "PluggyDataHandler":
+        """Created on first use, so pandas is only imported when data is saved."""
+        if self._data_handler is None:
+            from .data_handler import PluggyDataHandler
+
+            self._data_handler = PluggyDataHandler()
+        return self._data_handler
 
     # transactions
     def get_all_transactions(
@@ -74,6 +97,17 @@ class PluggyFacade:
         # TODO: handle status_code
         return response.get("results", {}), response.get("totalPages", {})
 
+    def get_transactions_for_accounts(
+        self, account_ids: Iterable[str], from_date=None, to_date=None
+    ) -> dict[str, list]:
+        """Get all transactions of each account, fetching accounts concurrently."""
+        return self._fetch_many(
+            account_ids,
+            lambda account_id: self.get_all_transactions(
+                account_id, from_date, to_date
+            ),
+        )
+
     # connectors
     def get_connector_list(self, country_code="BR", open_finance=True) -> dict | None:
         endpoint = "connectors"
@@ -110,6 +144,7 @@ class PluggyFacade:
     def _fetch_connectors_if_needed(self, open_finance: bool) -> dict | None:
         if not self._connectors:
             self._connectors = self.get_connector_list(open_finance=open_finance)
+            self._credential_validators = {}
         return self._connectors
 
     def _find_connector_by_id_or_name(
@@ -162,10 +197,16 @@ class PluggyFacade:
     def get_account_list(self, item_id):
         endpoint = "accounts"
         query_params = {"itemId": item_id}
-        response = self.api.get(endpoint, query_params)
+        response, status_code = self.api.get(endpoint, query_params)
         return response.get("results")
 
+    def get_accounts_for_items(self, item_ids: Iterable[str]) -> dict[str, list]:
+        return self._fetch_many(item_ids, self.get_account_list)
+
     # item
+    def get_items(self, item_ids: Iterable[str]) -> dict[str, dict[Any, Any]]:
+        return self._fetch_many(item_ids, self.get_item_detail)
+
     def get_item_detail(self, item_id: str) -> dict[Any, Any]:
         endpoint = f"items/{item_id}"
         response, status_code = self.api.get(endpoint)
@@ -224,9 +265,64 @@ class PluggyFacade:
         Returns:
             dict[str, Any]: contains the payload required by the API to create an item
         """
-        connector_id = connector.get("id")
-        required_credentials = connector.get("credentials", [])
-        payload: dict[str, Any] = {"connectorId": connector_id, "parameters": {}}
+        self._check_credentials(connector, credentials)
+        return self._build_item_payload(
+            connector, credentials, webhook_url, products, client_user_id
+        )
+
+    def create_item_payloads(
+        self,
+        connector: dict[str, Any],
+        credentials_list: list[dict[str, Any]],
+        webhook_url: str | None = None,
+        products: list[str] | None = None,
+        client_user_ids: list[str | None] | None = None,
+    ) -> tuple[dict[int, dict[str, Any]], dict[int, list[Exception]]]:
+        """Validates and builds item payloads for many users in one pass.
+
+        Args:
+            connector (dict[str, Any]): connector dict shared by every user
+            credentials_list (list[dict[str, Any]]): one credentials dict per user
+            webhook_url (str | None): Url to be notified of item changes
+            products (list[str] | None): Products to be collected in the connection
+            client_user_ids (list[str | None] | None): one client user id per user
+
+        Returns:
+            tuple[dict[int, dict[str, Any]], dict[int, list[Exception]]]: payloads
+                of the valid credentials and every error of the invalid ones, both
+                keyed by the credentials' position in credentials_list
+        """
+        if client_user_ids is not None and len(client_user_ids) != len(
+            credentials_list
+        ):
+            raise ValueError("client_user_ids must have one entry per credentials.")
+
+        validators = self._get_credential_validators(connector)
+        payloads: dict[int, dict[str, Any]] = {}
+        errors: dict[int, list[Exception]] = {}
+
+        for position, credentials in enumerate(credentials_list):
+            credential_errors = self._credential_errors(validators, credentials)
+            if credential_errors:
+                errors[position] = credential_errors
+                continue
+
+            client_user_id = client_user_ids[position] if client_user_ids else None
+            payloads[position] = self._build_item_payload(
+                connector, credentials, webhook_url, products, client_user_id
+            )
+
+        return payloads, errors
+
+    def _build_item_payload(
+        self,
+        connector: dict[str, Any],
+        credentials: dict[str, Any],
+        webhook_url: str | None,
+        products: list[str] | None,
+        client_user_id: str | None,
+    ) -> dict[str, Any]:
+        payload: dict[str, Any] = {"connectorId": connector.get("id"), "parameters": {}}
 
         if webhook_url is not None:
             payload["parameters"]["webhookUrl"] = webhook_url
@@ -235,10 +331,9 @@ class PluggyFacade:
         if client_user_id is not None:
             payload["parameters"]["clientUserId"] = client_user_id
 
-        for required_credential in required_credentials:
-            credential_name = required_credential.get("name")
-            self._validate_credential(credential_name, required_credential, credentials)
-            payload["parameters"][credential_name] = credentials[credential_name]
+        for validator in self._get_credential_validators(connector):
+            if validator.name in credentials:
+                payload["parameters"][validator.name] = credentials[validator.name]
 
         return payload
 
@@ -250,18 +345,81 @@ class PluggyFacade:
         count = response.get("count", 0)
         return count
 
-    def _validate_credential(
+    def _fetch_many(
         self,
-        credential_name: str,
-        required_credential: dict[str, Any],
-        credentials: dict[str, Any],
-    ):
-        escaped_regex = required_credential.get("validation", None)
-        optional = required_credential.get("optional", False)
+        ids: Iterable[IdT],
+        fetch: Callable[[IdT], ResultT],
+        max_workers: int | None = None,
+    ) -> dict[IdT, ResultT]:
+        """Calls fetch once per distinct id, concurrently over the api's session.
+
+        Results are keyed by id, in the order the ids were first given. The first
+        failed call is raised, like the single-id methods do.
+        """
+        unique_ids = list(dict.fromkeys(ids))
+        if not unique_ids:
+            return {}
 
-        if credential_name not in credentials and not optional:
-            raise MissingCredentialError(f"Missing credential: {credential_name}")
+        max_workers = min(max_workers or self.api.MAX_CONNECTIONS, len(unique_ids))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(unique_ids, executor.map(fetch, unique_ids)))
 
-        if escaped_regex is not None:
-            if not re.match(escaped_regex, credentials[credential_name]):
-                raise InvalidCredentialError(f"Invalid credential: {credential_name}")
+    def _get_credential_validators(
+        self, connector: dict[str, Any]
+    ) -> list[CredentialValidator]:
+        """Compiles the connector's credential regexes once per connector id.
+
+        Connectors without an id are compiled on every call, since they cannot be
+        told apart in the cache.
+        """
+        connector_id = connector.get("id")
+        validators = (
+            self._credential_validators.get(connector_id)
+            if connector_id is not None
+            else None
+        )
+        if validators is None:
+            validators = [
+                CredentialValidator(
+                    required_credential.get("name"),
+                    (
+                        re.compile(required_credential["validation"])
+                        if required_credential.get("validation") is not None
+                        else None
+                    ),
+                    required_credential.get("optional", False),
+                )
+                for required_credential in connector.get("credentials", [])
+            ]
+            if connector_id is not None:
+                self._credential_validators[connector_id] = validators
+        return validators
+
+    def _check_credentials(
+        self, connector: dict[str, Any], credentials: dict[str, Any]
+    ) -> None:
+        validators = self._get_credential_validators(connector)
+        credential_errors = self._credential_errors(validators, credentials)
+        if credential_errors:
+            raise credential_errors[0]
+
+    def _credential_errors(
+        self, validators: list[CredentialValidator], credentials: dict[str, Any]
+    ) -> list[Exception]:
+        errors: list[Exception] = []
+        for validator in validators:
+            if validator.name not in credentials:
+                if not validator.optional:
+                    errors.append(
+                        MissingCredentialError(f"Missing credential: {validator.name}")
+                    )
+                continue
+
+            value = credentials[validator.name]
+            if validator.pattern is not None and (
+                not isinstance(value, str) or not validator.pattern.match(value)
+            ):
+                errors.append(
+                    InvalidCredentialError(f"Invalid credential: {validator.name}")
+                )
+        return errors
@@ -1,7 +1,9 @@
 import requests
 from requests import JSONDecodeError, exceptions
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timedelta
 import json
+import threading
 from pathlib import Path
 from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_fixed
 from typing import Any
@@ -10,6 +12,8 @@ import logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+AUTH_ENDPOINT = "auth"
+
 ACCEPT_JSON_RESPONSE_HEADER = {
     "accept": "application/json",
     "content-type": "application/json",
@@ -18,6 +22,7 @@ ACCEPT_JSON_RESPONSE_HEADER = {
 
 class PluggyApi:
     API_KEY_EXPIRE_HOURS: int = 2
+    MAX_CONNECTIONS: int = 10
 
     def __init__(self, client_id: str, client_secret: str, api_url: str) -> None:
         self.client_id: str = client_id
@@ -26,6 +31,12 @@ class PluggyApi:
         self._api_key: str | None
         self._api_key_last_updated: datetime | None
         self._api_key, self._api_key_last_updated = self.load_cached_api_key()
+        self._api_key_lock = threading.Lock()
+        # shared by every call, so concurrent requests reuse pooled connections
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=self.MAX_CONNECTIONS)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def cache_api_key(self) -> None:
         data = {
@@ -59,22 +70,27 @@ class PluggyApi:
         )
 
     def generate_api_key(self) -> str | None:
-        if self._api_key_last_updated and abs(
-            datetime.now() - self._api_key_last_updated
-        ) > timedelta(hours=self.API_KEY_EXPIRE_HOURS):
-            logger.debug("API Key expired. Generating a new one.")
-            self.request_new_api_key()
+        """Returns a valid API key, requesting a new one if missing or expired.
+
+        Called before every request, under a lock so concurrent calls share a
+        single auth round trip.
+        """
+        with self._api_key_lock:
+            if self._api_key_last_updated and abs(
+                datetime.now() - self._api_key_last_updated
+            ) > timedelta(hours=self.API_KEY_EXPIRE_HOURS):
+                logger.debug("API Key expired. Generating a new one.")
+                self.request_new_api_key()
 
-        if not self._api_key:
-            logger.debug("Generating API Key for the first time.")
-            self.request_new_api_key()
+            if not self._api_key:
+                logger.debug("Generating API Key for the first time.")
+                self.request_new_api_key()
 
-        logger.debug(f"API Key: {self._api_key}")
-        return self._api_key
+            return self._api_key
 
     def request_new_api_key(self) -> None:
         payload = {"clientId": self.client_id, "clientSecret": self.client_secret}
-        response_json, return_code = self._call_api("POST", "auth", payload)
+        response_json, return_code = self._call_api("POST", AUTH_ENDPOINT, payload)
         self._api_key = response_json.get("apiKey")
         self._api_key_last_updated = datetime.now()
         self.cache_api_key()
@@ -168,6 +184,9 @@ class PluggyApi:
         if headers is None:
             headers = {}
 
+        if endpoint != AUTH_ENDPOINT:
+            self.generate_api_key()
+
         logger.debug(f"calling API endpoint: {url_to_call}")
         logger.debug(f"method: {method}")
         logger.debug(f"payload: {payload}")
@@ -175,7 +194,7 @@ class PluggyApi:
         logger.debug(f"headers: {headers}")
 
         try:
-            response = requests.request(
+            response = self.session.request(
                 method,
                 url_to_call,
                 json=payload,
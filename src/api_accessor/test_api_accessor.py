@@ -1,9 +1,175 @@
+import pathlib
+import subprocess
+import sys
+
 import pytest
-import data_handler
-import facade
-import pluggy_api
-import status
+from api_accessor import cli, data_handler, facade, pluggy_api, status
+
 
 class TestEverythingBuilds:
     def test_build(self):
-        assert True
\ No newline at end of file
+        assert True
+
+
+class TestCli:
+    def test_parser(self):
+        args = cli.build_parser().parse_args(["status", "item-id"])
+        assert args.handler is cli.status
+        assert args.item_id == "item-id"
+
+    def test_import_is_lightweight(self):
+        heavy_modules = [
+            "pandas",
+            "requests",
+            "tenacity",
+            "dotenv",
+            "api_accessor.facade",
+        ]
+        code = f"import sys, api_accessor.cli; print([m for m in {heavy_modules} if m in sys.modules])"
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=pathlib.Path(__file__).parent.parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        assert output.strip() == "[]"
+
+
+class TestApiKey:
+    def test_first_call_carries_api_key(self, monkeypatch, tmp_path):
+        monkeypatch.chdir(tmp_path)
+        api = pluggy_api.PluggyApi("client_id", "client_secret", "https://api.test")
+        calls = []
+
+        class Response:
+            status_code = 200
+
+            def __init__(self, body):
+                self.body = body
+
+            def json(self):
+                return self.body
+
+            def raise_for_status(self):
+                pass
+
+        def request(method, url, headers=None, **kwargs):
+            calls.append((url, headers))
+            if url.endswith("/auth"):
+                return Response({"apiKey": "secret"})
+            return Response({"results": []})
+
+        monkeypatch.setattr(api.session, "request", request)
+
+        api.get("connectors")
+
+        assert [url for url, _ in calls] == [
+            "https://api.test/auth",
+            "https://api.test/connectors",
+        ]
+        assert calls[1][1]["X-API-KEY"] == "secret"
+
+
+class TestItemPayloads:
+    connector = {
+        "id": 612,
+        "credentials": [
+            {"name": "cpf", "validation": "^\\d{11}$"},
+            {"name": "token", "optional": True},
+        ],
+    }
+
+    def test_validators_are_cached_per_connector(self):
+        pluggy = facade.PluggyFacade("client_id", "client_secret")
+        validators = pluggy._get_credential_validators(self.connector)
+        assert pluggy._get_credential_validators(dict(self.connector)) is validators
+
+    def test_validators_without_connector_id_are_not_shared(self):
+        pluggy = facade.PluggyFacade("client_id", "client_secret")
+        pluggy._get_credential_validators({"credentials": [{"name": "cpf"}]})
+        validators = pluggy._get_credential_validators(
+            {"credentials": [{"name": "token"}]}
+        )
+
+        assert [validator.name for validator in validators] == ["token"]
+
+    def test_single_payload_raises(self):
+        pluggy = facade.PluggyFacade("client_id", "client_secret")
+        with pytest.raises(facade.InvalidCredentialError):
+            pluggy._create_item_payload(
+                self.connector, {"cpf": "123"}, None, None, None
+            )
+
+    def test_bulk_payloads_collect_errors(self):
+        pluggy = facade.PluggyFacade("client_id", "client_secret")
+        credentials_list = [{"cpf": "12345678901"}, {"cpf": "123"}, {}]
+
+        payloads, errors = pluggy.create_item_payloads(
+            self.connector, credentials_list, client_user_ids=["a", "b", "c"]
+        )
+
+        assert payloads == {
+            0: {
+                "connectorId": 612,
+                "parameters": {"clientUserId": "a", "cpf": "12345678901"},
+            }
+        }
+        assert [type(error) for error in errors[1]] == [facade.InvalidCredentialError]
+        assert [type(error) for error in errors[2]] == [facade.MissingCredentialError]
+
+
+class TestBulkRequests:
+    def test_get_items_deduplicates_ids(self, monkeypatch):
+        pluggy = facade.PluggyFacade("client_id", "client_secret")
+        endpoints = []
+
+        def get(endpoint, query_params=None):
+            endpoints.append(endpoint)
+            return {"id": endpoint.split("/")[-1]}, 200
+
+        monkeypatch.setattr(pluggy.api, "get", get)
+
+        items = pluggy.get_items(["b", "a", "b"])
+
+        assert items == {"b": {"id": "b"}, "a": {"id": "a"}}
+        assert sorted(endpoints) == ["items/a", "items/b"]
+
+    def test_get_accounts_for_items(self, monkeypatch):
+        pluggy = facade.PluggyFacade("client_id", "client_secret")
+        monkeypatch.setattr(
+            pluggy.api,
+            "get",
+            lambda endpoint, query_params=None: (
+                {"results": [{"itemId": query_params["itemId"]}]},
+                200,
+            ),
+        )
+
+        assert pluggy.get_accounts_for_items(["a"]) == {"a": [{"itemId": "a"}]}
+        assert pluggy.get_accounts_for_items([]) == {}
+
+    def test_get_transactions_for_accounts_pages_each_account_once(self, monkeypatch):
+        pluggy = facade.PluggyFacade("client_id", "client_secret")
+        pages = {
+            "a": [[{"id": "a1"}, {"id": "a2"}], [{"id": "a3"}]],
+            "b": [[{"id": "b1"}]],
+        }
+        calls = []
+
+        def get(endpoint, query_params=None):
+            account_id, page = query_params["accountId"], query_params["page"]
+            calls.append((account_id, page))
+            return {
+                "results": pages[account_id][page - 1],
+                "totalPages": len(pages[account_id]),
+            }, 200
+
+        monkeypatch.setattr(pluggy.api, "get", get)
+
+        transactions = pluggy.get_transactions_for_accounts(["a", "b", "a"])
+
+        assert list(transactions) == ["a", "b"]
+        assert [t["id"] for t in transactions["a"]] == ["a1", "a2", "a3"]
+        assert [t["id"] for t in transactions["b"]] == ["b1"]
+        assert sorted(calls) == [("a", 1), ("a", 2), ("b", 1)]
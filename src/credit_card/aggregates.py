@@ -0,0 +1,154 @@
+import pandas as pd
+import normalization
+import primitives
+import validators
+
+DEFAULT_CARD = ""
+
+_StatementKey = tuple[str, primitives.TransactionMonth]
+
+
+def billing_months(dates: pd.Series, closing_day: int | None = None) -> pd.DataFrame:
+    """Returns the year and month of the statement each date is billed on.
+
+    Purchases made after the closing day go to the next month's statement.
+    Timezone-aware dates are compared in normalization.LOCAL_TIMEZONE.
+    """
+    dates = normalization.to_local_time(dates)
+    month_index = dates.dt.year * 12 + dates.dt.month - 1
+    if closing_day is not None:
+        month_index += (dates.dt.day > closing_day).astype(int)
+    return pd.DataFrame({"year": month_index // 12, "month": month_index % 12 + 1})
+
+
+def _cards(df: pd.DataFrame, card: str | None):
+    if card is not None:
+        return card
+    if "card" in df:
+        return df["card"].astype(object).to_numpy()
+    return DEFAULT_CARD
+
+
+class StatementAggregates:
+    """Totals per (card, billing month, category), kept up to date incrementally.
+
+    Appending or recategorizing transactions only touches the affected groups,
+    and queries read a precomputed dict instead of scanning the transactions.
+    """
+
+    def __init__(self, closing_day: int | None = None):
+        if closing_day is not None:
+            validators.possible_due_date_validator(closing_day)
+        self.closing_day = closing_day
+        # category -> (amount, number of transactions)
+        self._totals: dict[_StatementKey, dict[str, tuple[float, int]]] = {}
+
+    @classmethod
+    def from_transactions(
+        cls, df: pd.DataFrame, card: str | None = None, closing_day: int | None = None
+    ) -> "StatementAggregates":
+        aggregates = cls(closing_day)
+        aggregates.append(df, card)
+        return aggregates
+
+    def append(self, df: pd.DataFrame, card: str | None = None) -> None:
+        """Adds new transactions to the given card, or to df['card'] when present."""
+        self._apply(df, df["category"], card, sign=1)
+
+    def remove(self, df: pd.DataFrame, card: str | None = None) -> None:
+        self._apply(df, df["category"], card, sign=-1)
+
+    def recategorize(
+        self, df: pd.DataFrame, to_category: str, card: str | None = None
+    ) -> None:
+        """Moves the given transactions, with their current categories, to to_category."""
+        self._apply(df, df["category"], card, sign=-1)
+        to_categories = pd.Series(to_category, index=df.index, dtype=object)
+        self._apply(df, to_categories, card, sign=1)
+
+    def rename_category(self, from_category: str, to_category: str) -> None:
+        """Same as batch_update_category, without going back to the transactions."""
+        for categories in self._totals.values():
+            if from_category not in categories:
+                continue
+            amount, count = categories.pop(from_category)
+            old_amount, old_count = categories.get(to_category, (0.0, 0))
+            categories[to_category] = (old_amount + amount, old_count + count)
+
+    def totals_by_category(
+        self, month: primitives.TransactionMonth, card: str = DEFAULT_CARD
+    ) -> dict[str, float]:
+        categories = self._totals.get((card, month), {})
+        return {category: amount for category, (amount, _) in categories.items()}
+
+    def total(
+        self, month: primitives.TransactionMonth, card: str = DEFAULT_CARD
+    ) -> float:
+        categories = self._totals.get((card, month), {})
+        return sum(amount for amount, _ in categories.values())
+
+    def months(self, card: str = DEFAULT_CARD) -> list[primitives.TransactionMonth]:
+        return sorted(
+            (month for key_card, month in self._totals if key_card == card),
+            key=lambda month: (month.year, month.month),
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per (card, year, month, category) with its amount and count."""
+        rows = [
+            (card, month.year, month.month, category, amount, count)
+            for (card, month), categories in self._totals.items()
+            for category, (amount, count) in categories.items()
+        ]
+        return pd.DataFrame(
+            rows, columns=["card", "year", "month", "category", "amount", "count"]
+        )
+
+    def _apply(
+        self, df: pd.DataFrame, categories: pd.Series, card: str | None, sign: int
+    ) -> None:
+        if df.empty:
+            return
+
+        months = billing_months(df["date"], self.closing_day)
+        rows = pd.DataFrame(
+            {
+                "card": _cards(df, card),
+                "year": months["year"].to_numpy(),
+                "month": months["month"].to_numpy(),
+                "category": categories.astype(object).to_numpy(),
+                "amount": df[normalization.amount_column(df)].to_numpy(
+                    dtype="float64", na_value=float("nan")
+                ),
+            }
+        )
+        grouped = rows.groupby(
+            ["card", "year", "month", "category"], sort=False, dropna=False
+        )["amount"].agg(["sum", "size"])
+
+        updates = []
+        for group, amount, count in grouped.itertuples(name=None):
+            row_card, year, month, category = group
+            key = (row_card, primitives.TransactionMonth(int(year), int(month)))
+            updates.append((key, category, sign * float(amount), sign * int(count)))
+
+        # Check every group first, so a failed remove leaves the totals untouched.
+        for key, category, _, count in updates:
+            _, old_count = self._totals.get(key, {}).get(category, (0.0, 0))
+            if old_count + count < 0:
+                raise ValueError(f"Cannot remove unknown transactions from {key}.")
+
+        for key, category, amount, count in updates:
+            self._add(key, category, amount, count)
+
+    def _add(self, key: _StatementKey, category: str, amount: float, count: int):
+        categories = self._totals.get(key, {})
+        old_amount, old_count = categories.get(category, (0.0, 0))
+        new_count = old_count + count
+        if new_count == 0:
+            categories.pop(category, None)
+            if not categories:
+                self._totals.pop(key, None)
+        else:
+            categories[category] = (old_amount + amount, new_count)
+            self._totals[key] = categories
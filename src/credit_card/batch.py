@@ -0,0 +1,212 @@
+"""Nightly analytics over many users' transaction files.
+
+Every user is a shard: either a single file in the dataset root
+(`<root>/<user>.csv`) or a partition directory (`<root>/<user>/*.csv`).
+Shards run in a process pool, each one reading its files in chunks and
+folding them into StatementAggregates, keyed by the files' card column when
+they have one, so memory stays bounded by `chunk_size` rows per worker.
+"""
+
+import argparse
+import concurrent.futures
+import dataclasses
+import json
+import logging
+import pathlib
+import time
+from typing import Callable, Iterator, Mapping
+
+import pandas as pd
+
+import aggregates
+import normalization
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_SUFFIXES = (".csv", ".jsonl")
+DEFAULT_CHUNK_SIZE = 100_000
+# Card numbers are labels: keep "0123" and never mix ints with the "" default.
+_DTYPES = {"card": str}
+
+
+@dataclasses.dataclass
+class ShardResult:
+    user: str
+    rows: int
+    seconds: float
+    totals: pd.DataFrame
+
+
+@dataclasses.dataclass
+class FailedShard:
+    user: str
+    error: BaseException
+
+
+@dataclasses.dataclass
+class BatchResult:
+    totals: pd.DataFrame
+    shards: list[ShardResult]
+    failed: list[FailedShard]
+
+
+def find_shards(root: str | pathlib.Path) -> dict[str, list[pathlib.Path]]:
+    """Maps each user to their files, sorted for reproducible runs."""
+    root = pathlib.Path(root)
+    shards: dict[str, list[pathlib.Path]] = {}
+    for path in sorted(root.rglob("*")):
+        if path.suffix not in SUPPORTED_SUFFIXES or not path.is_file():
+            continue
+        relative = path.relative_to(root)
+        user = relative.parts[0] if len(relative.parts) > 1 else path.stem
+        shards.setdefault(user, []).append(path)
+    return shards
+
+
+def _read_chunks(path: pathlib.Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+    if path.suffix == ".jsonl":
+        with pd.read_json(
+            path, lines=True, dtype=_DTYPES, chunksize=chunk_size
+        ) as reader:
+            yield from reader
+    else:
+        with pd.read_csv(path, dtype=_DTYPES, chunksize=chunk_size) as reader:
+            yield from reader
+
+
+def _prepare_chunk(
+    chunk: pd.DataFrame,
+    category_mapping: Mapping[str, str] | None,
+    fx_rates_path: str | None,
+) -> pd.DataFrame:
+    chunk["date"] = normalization.to_local_time(chunk["date"])
+
+    if category_mapping:
+        chunk["category"] = chunk["category"].replace(category_mapping)
+
+    if "currencyCode" in chunk:
+        fx_rates = normalization.load_fx_rates(fx_rates_path) if fx_rates_path else None
+        normalization.normalize_amounts(chunk, fx_rates)
+    return chunk
+
+
+def process_shard(
+    user: str,
+    paths: list[pathlib.Path],
+    category_mapping: Mapping[str, str] | None = None,
+    closing_day: int | None = None,
+    fx_rates_path: str | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ShardResult:
+    """Loads, recategorizes and aggregates one user's files, chunk by chunk."""
+    start = time.perf_counter()
+    statement_aggregates = aggregates.StatementAggregates(closing_day)
+    rows = 0
+    for path in paths:
+        for chunk in _read_chunks(path, chunk_size):
+            chunk = _prepare_chunk(chunk, category_mapping, fx_rates_path)
+            statement_aggregates.append(chunk)
+            rows += len(chunk)
+
+    totals = statement_aggregates.to_frame()
+    totals.insert(0, "user", user)
+    return ShardResult(user, rows, time.perf_counter() - start, totals)
+
+
+def run_batch(
+    root: str | pathlib.Path,
+    category_mapping: Mapping[str, str] | None = None,
+    closing_day: int | None = None,
+    fx_rates_path: str | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_workers: int | None = None,
+    on_shard_done: Callable[[ShardResult, int, int], None] | None = None,
+) -> BatchResult:
+    """Aggregates every shard under root in a process pool and merges the totals.
+
+    A shard that raises is recorded in BatchResult.failed and the other shards
+    are still merged. on_shard_done is called in the parent with each successful
+    result, the number of shards done so far and the total, in completion order.
+    """
+    shards = find_shards(root)
+    results: list[ShardResult] = []
+    failed: list[FailedShard] = []
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                process_shard,
+                user,
+                paths,
+                category_mapping,
+                closing_day,
+                fx_rates_path,
+                chunk_size,
+            ): user
+            for user, paths in shards.items()
+        }
+        for future in concurrent.futures.as_completed(futures):
+            done = len(results) + len(failed) + 1
+            try:
+                result = future.result()
+            except Exception as error:
+                failed.append(FailedShard(futures[future], error))
+                logger.error(
+                    f"[{done}/{len(futures)}] {futures[future]}: failed - {error!r}"
+                )
+                continue
+
+            results.append(result)
+            logger.info(
+                f"[{done}/{len(futures)}] {result.user}: "
+                f"{result.rows} rows in {result.seconds:.2f}s"
+            )
+            if on_shard_done:
+                on_shard_done(result, done, len(futures))
+
+    results.sort(key=lambda result: result.user)
+    failed.sort(key=lambda failed_shard: failed_shard.user)
+    empty_totals = aggregates.StatementAggregates().to_frame()
+    empty_totals.insert(0, "user", pd.Series(dtype=object))
+    totals = pd.concat(
+        [result.totals for result in results] or [empty_totals], ignore_index=True
+    )
+    return BatchResult(totals, results, failed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root")
+    parser.add_argument("--output", default="totals.csv")
+    parser.add_argument("--closing-day", type=int)
+    parser.add_argument("--fx-rates")
+    parser.add_argument(
+        "--category-mapping",
+        help="JSON file mapping categories to the ones they are replaced with.",
+    )
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    category_mapping = None
+    if args.category_mapping:
+        with open(args.category_mapping, encoding="utf-8") as f:
+            category_mapping = json.load(f)
+
+    start = time.perf_counter()
+    batch_result = run_batch(
+        args.root,
+        category_mapping=category_mapping,
+        closing_day=args.closing_day,
+        fx_rates_path=args.fx_rates,
+        chunk_size=args.chunk_size,
+        max_workers=args.workers,
+    )
+    batch_result.totals.to_csv(args.output, index=False)
+    logger.info(
+        f"{len(batch_result.shards)} shards in {time.perf_counter() - start:.2f}s, "
+        f"{len(batch_result.failed)} failed"
+    )
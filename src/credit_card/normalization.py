@@ -0,0 +1,99 @@
+import functools
+
+import pandas as pd
+
+from financial_assets import currencies
+
+ACCOUNT_AMOUNT_COLUMN = "accountAmount"
+DEFAULT_ACCOUNT_CURRENCY = "BRL"
+LOCAL_TIMEZONE = "America/Sao_Paulo"
+
+
+@functools.cache
+def load_fx_rates(file_path: str) -> pd.DataFrame:
+    """Loads a rate table once per file. Do not mutate the result.
+
+    The file is a csv with date, currencyCode and rate columns, where rate is the
+    value of one unit of currencyCode in the account currency on that date.
+    """
+    fx_rates = pd.read_csv(file_path, usecols=["date", "currencyCode", "rate"])
+    fx_rates["date"] = _as_calendar_dates(pd.to_datetime(fx_rates["date"]))
+    fx_rates["currencyCode"] = currencies.normalize_codes(fx_rates["currencyCode"])
+    fx_rates["rate"] = fx_rates["rate"].astype("float64")
+    return fx_rates.sort_values("date", ignore_index=True)
+
+
+def amount_column(df: pd.DataFrame) -> str:
+    """The column to sum: account currency amounts when normalize_amounts ran."""
+    return ACCOUNT_AMOUNT_COLUMN if ACCOUNT_AMOUNT_COLUMN in df else "amount"
+
+
+def to_local_time(dates: pd.Series) -> pd.Series:
+    """Parses dates, converting timezone-aware ones (the API's UTC timestamps) to
+    LOCAL_TIMEZONE so days and billing months match the card holder's."""
+    dates = pd.to_datetime(dates, format="ISO8601")
+    if isinstance(dates.dtype, pd.DatetimeTZDtype):
+        dates = dates.dt.tz_convert(LOCAL_TIMEZONE)
+    return dates
+
+
+def _as_calendar_dates(dates: pd.Series) -> pd.Series:
+    dates = to_local_time(dates)
+    if isinstance(dates.dtype, pd.DatetimeTZDtype):
+        dates = dates.dt.tz_localize(None)
+    return dates.dt.normalize().astype("datetime64[ns]")
+
+
+def normalize_amounts(
+    df: pd.DataFrame,
+    fx_rates: pd.DataFrame | None = None,
+    account_currency: str = DEFAULT_ACCOUNT_CURRENCY,
+) -> None:
+    """Fills ACCOUNT_AMOUNT_COLUMN with every amount in the account currency.
+
+    amountInAccountCurrency is used when the provider sent it, amounts already in
+    the account currency are copied, and the rest are converted with the latest
+    rate on or before the transaction date. Codes are matched case-insensitively
+    and rows that need a rate but have no currency code raise ValueError.
+    """
+    amounts = df["amount"].astype("Float64")
+    if "amountInAccountCurrency" in df:
+        account_amounts = df["amountInAccountCurrency"].astype("Float64")
+    else:
+        account_amounts = pd.Series(pd.NA, index=df.index, dtype="Float64")
+
+    currency_codes = currencies.normalize_codes(df["currencyCode"])
+    account_currency = currencies.get_currency(account_currency).cc
+    same_currency = account_amounts.isna() & (currency_codes == account_currency)
+    account_amounts = account_amounts.mask(same_currency, amounts)
+
+    pending = account_amounts.isna() & amounts.notna()
+    if pending.any():
+        if fx_rates is None:
+            raise ValueError("An fx rate table is needed to convert foreign amounts.")
+        rates = _rates_as_of(df.loc[pending, "date"], currency_codes[pending], fx_rates)
+        currencies.check_rates(currency_codes[pending], rates)
+        account_amounts[pending] = amounts[pending] * rates
+
+    df[ACCOUNT_AMOUNT_COLUMN] = account_amounts
+
+
+def _rates_as_of(
+    dates: pd.Series, currency_codes: pd.Series, fx_rates: pd.DataFrame
+) -> pd.Series:
+    transactions = pd.DataFrame(
+        {
+            "date": _as_calendar_dates(pd.to_datetime(dates)),
+            "currencyCode": currency_codes,
+            "position": range(len(dates)),
+        }
+    ).sort_values("date", kind="stable")
+    matched = pd.merge_asof(
+        transactions,
+        fx_rates[["date", "currencyCode", "rate"]],
+        on="date",
+        by="currencyCode",
+        direction="backward",
+    )
+    rates = matched.sort_values("position")["rate"].to_numpy()
+    return pd.Series(rates, index=dates.index)
@@ -1,5 +1,6 @@
 import json
 import pandas as pd
+import normalization
 import primitives
 import zoneinfo
 
@@ -38,4 +39,8 @@ def add_purchase_month_column(df: pd.DataFrame):
     df.insert(2, 'purchase_month', ts)
 
 def get_total_by(df: pd.DataFrame, column_name: str) -> pd.DataFrame:
-    return df.groupby(column_name)['amount'].agg(sum)
+    """Sums in the account currency when normalization.normalize_amounts was applied.
+
+    For repeated queries over the same transactions use aggregates.StatementAggregates.
+    """
+    return df.groupby(column_name, observed=True)[normalization.amount_column(df)].sum()
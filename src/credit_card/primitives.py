@@ -1,5 +1,6 @@
 import dataclasses
 import datetime
+import enum
 import validators
 
 
@@ -33,6 +34,10 @@ class TransactionMonth:
         if self.month > other.month: return True
         return False
 
+class ChargeKind(enum.Enum):
+    INSTALLMENT = "installment"
+    RECURRING = "recurring"
+
 @dataclasses.dataclass
 class CreditCardInfo:
     name: CreditCardName
@@ -0,0 +1,172 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+import normalization
+
+SOURCE_COLUMN = "source"
+KEY_COLUMN = "transactionKey"
+
+# "Aliexpress 1/2", "Uber Parcela 3/10", "Loja - Parcela 3 de 10". Suffixes
+# that cannot be an installment, like "Posto 24/7" or "Loja 12/03", are kept.
+_INSTALLMENT_PATTERN = (
+    r"(?i)\s*[-(]?\s*(?:parcela\s*)?(\d{1,3})\s*(?:/|de)\s*(\d{1,3})\)?\s*$"
+)
+
+
+def _title_column(df: pd.DataFrame) -> str:
+    return "title" if "title" in df else "description"
+
+
+def parse_installments(titles: pd.Series) -> pd.DataFrame:
+    """Extracts installmentNumber and totalInstallments, NA for single payments."""
+    installments = (
+        titles.astype("string")
+        .str.extract(_INSTALLMENT_PATTERN)
+        .set_axis(["installmentNumber", "totalInstallments"], axis=1)
+        .astype("Int64")
+    )
+    number, total = installments["installmentNumber"], installments["totalInstallments"]
+    is_installment = ((number >= 1) & (number <= total)).fillna(False)
+    return installments.where(is_installment)
+
+
+def _drop_installment(match: re.Match) -> str:
+    number, total = int(match[1]), int(match[2])
+    return "" if 1 <= number <= total else match[0]
+
+
+def normalize_titles(titles: pd.Series) -> pd.Series:
+    """Lowercases titles and drops installment suffixes and punctuation noise."""
+    return (
+        titles.astype("string")
+        .str.replace(_INSTALLMENT_PATTERN, _drop_installment, regex=True)
+        .str.normalize("NFKD")
+        .str.encode("ascii", errors="ignore")
+        .str.decode("ascii")
+        .str.lower()
+        .str.replace(r"[^a-z0-9]+", " ", regex=True)
+        .str.strip()
+    )
+
+
+def title_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Returns the normalized merchant and installment columns for every row."""
+    # Titles repeat a lot, so the string work is done once per distinct title.
+    codes, uniques = pd.factorize(df[_title_column(df)], use_na_sentinel=False)
+    unique_titles = pd.Series(uniques, dtype="string")
+    features = parse_installments(unique_titles)
+    features.insert(0, "merchant", normalize_titles(unique_titles))
+    features = features.take(codes)
+    features.index = df.index
+    return features
+
+
+def _local_days(dates: pd.Series) -> pd.Series:
+    dates = normalization.to_local_time(dates)
+    if isinstance(dates.dtype, pd.DatetimeTZDtype):
+        dates = dates.dt.tz_localize(None)
+    return dates.dt.normalize()
+
+
+def _card_suffixes(df: pd.DataFrame) -> pd.Series:
+    if "card" not in df:
+        return pd.Series("", index=df.index, dtype="string")
+    return df["card"].astype("string").str.replace(r"\D", "", regex=True).str[-4:]
+
+
+_INSTALLMENT_KEYS = ["title", "cents", "card", "installmentNumber", "totalInstallments"]
+
+
+def _key_frame(df: pd.DataFrame) -> pd.DataFrame:
+    titles = title_features(df)
+    is_installment = titles["installmentNumber"].notna()
+
+    days = _local_days(df["date"])
+    # Installment k is billed about k - 1 months after the purchase.
+    purchase_months = (
+        days.dt.year * 12 + days.dt.month - 1 - (titles["installmentNumber"] - 1)
+    )
+    amounts = df[normalization.amount_column(df)].to_numpy(
+        dtype="float64", na_value=np.nan
+    )
+    return pd.DataFrame(
+        {
+            "day": days.mask(is_installment),
+            "title": titles["merchant"],
+            "cents": np.round(amounts * 100),
+            "card": _card_suffixes(df),
+            "installmentNumber": titles["installmentNumber"],
+            "totalInstallments": titles["totalInstallments"],
+            "purchaseMonth": purchase_months.astype("Int64"),
+        },
+        index=df.index,
+    )
+
+
+def transaction_keys(df: pd.DataFrame) -> pd.Series:
+    """Hashes (date, normalized title, amount, card suffix) into one uint64 per row.
+
+    Installments are keyed by their number, total and estimated purchase month
+    instead of the day, since statements and the API disagree on which day an
+    installment is posted.
+    """
+    return pd.util.hash_pandas_object(_key_frame(df), index=False)
+
+
+def snap_purchase_months(frame: pd.DataFrame, by: list[str]) -> pd.Series:
+    """Snaps frame's purchaseMonth to the start of its cluster within each by group.
+
+    A cluster starts at a group's earliest unclustered month and takes the months
+    at most one month after it, so rounding around the closing date still matches
+    but a cluster never spans more than two months. Missing months stay missing.
+    """
+    known = frame.loc[frame["purchaseMonth"].notna()].sort_values(
+        [*by, "purchaseMonth"]
+    )
+    starts_group = ~known.duplicated(by)
+    starts = []
+    cluster_start = 0
+    # Sequential on purpose: comparing with the previous row would chain a run of
+    # consecutive months into one cluster.
+    for month, new_group in zip(known["purchaseMonth"].tolist(), starts_group.tolist()):
+        if new_group or month - cluster_start > 1:
+            cluster_start = month
+        starts.append(cluster_start)
+
+    snapped = frame["purchaseMonth"].copy()
+    snapped.loc[known.index] = starts
+    return snapped
+
+
+def merge_transactions(*sources: pd.DataFrame) -> pd.DataFrame:
+    """Merges overlapping exports, keeping each transaction once.
+
+    Sources are treated as multisets: a transaction repeated twice in one file is
+    kept twice, and only occurrences beyond what an earlier source already had are
+    added. Earlier sources win, so pass the most detailed one (e.g. the API) first.
+    Installments match when their estimated purchase months are at most one
+    month apart. The tradeoff is that two separate but otherwise identical
+    purchases made a month apart, one in each source, are kept once. Runs in
+    linear time, up to sorting the installment rows, using a hash group-by on the
+    transaction keys.
+    """
+    if not sources:
+        raise ValueError("At least one source is needed.")
+
+    transactions = pd.concat(sources, ignore_index=True)
+    transactions[SOURCE_COLUMN] = np.repeat(
+        np.arange(len(sources)), [len(source) for source in sources]
+    )
+    keys = pd.concat([_key_frame(source) for source in sources], ignore_index=True)
+    keys["purchaseMonth"] = snap_purchase_months(keys, _INSTALLMENT_KEYS)
+    transactions[KEY_COLUMN] = pd.util.hash_pandas_object(keys, index=False)
+
+    occurrence = transactions.groupby(
+        [SOURCE_COLUMN, KEY_COLUMN], sort=False
+    ).cumcount()
+    is_duplicate = pd.DataFrame(
+        {KEY_COLUMN: transactions[KEY_COLUMN], "occurrence": occurrence}
+    ).duplicated()
+    return transactions.loc[~is_duplicate].reset_index(drop=True)
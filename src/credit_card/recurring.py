@@ -0,0 +1,234 @@
+import numpy as np
+import pandas as pd
+
+import aggregates
+import normalization
+import primitives
+import reconciliation
+
+# Charges that repeat every PERIODS months count as recurring: monthly and yearly.
+PERIODS = (1, 12)
+
+
+def _group_keys(df: pd.DataFrame) -> list[str]:
+    return ["card", "merchant"] if "card" in df else ["merchant"]
+
+
+def _charges(df: pd.DataFrame, closing_day: int | None) -> pd.DataFrame:
+    months = aggregates.billing_months(df["date"], closing_day)
+    charges = reconciliation.title_features(df)
+    if "card" in df:
+        charges.insert(0, "card", df["card"].astype(object))
+    charges["monthIndex"] = (months["year"] * 12 + months["month"] - 1).to_numpy()
+    charges["amount"] = df[normalization.amount_column(df)].to_numpy(
+        dtype="float64", na_value=np.nan
+    )
+    return charges
+
+
+def _split_month_index(month_index: pd.Series) -> tuple[pd.Series, pd.Series]:
+    return month_index // 12, month_index % 12 + 1
+
+
+def _purchase_months(charges: pd.DataFrame, series_keys: list[str]) -> pd.Series:
+    """Estimates each installment's purchase month, monthIndex - (number - 1).
+
+    Nubank posts anticipated installments together in one bill, as a run of
+    consecutive numbers up to the last one ("Loja 3/6" to "Loja 6/6"). Those take
+    the purchase month of the run's first installment. Two purchases whose
+    installments happen to form such a run in the same bill are read as one.
+    Installments are posted around the closing date, so estimates a month apart
+    are snapped together like reconciliation does.
+    """
+    number = charges["installmentNumber"]
+    starts_run = ~charges.duplicated([*series_keys, "monthIndex"]) | (
+        number.diff() != 1
+    )
+    runs = charges.assign(purchaseMonth=charges["monthIndex"] - (number - 1)).groupby(
+        starts_run.cumsum()
+    )
+    is_anticipated = (runs["installmentNumber"].transform("size") > 1) & (
+        runs["installmentNumber"].transform("max") == charges["totalInstallments"]
+    )
+    purchase_months = (
+        runs["purchaseMonth"]
+        .transform("first")
+        .where(is_anticipated, charges["monthIndex"] - (number - 1))
+    )
+    return reconciliation.snap_purchase_months(
+        charges[series_keys].assign(purchaseMonth=purchase_months), series_keys
+    )
+
+
+def detect_installments(
+    df: pd.DataFrame, closing_day: int | None = None
+) -> pd.DataFrame:
+    """Groups installment rows ("Loja 3/8") into one row per purchase.
+
+    Rows of a purchase share the merchant, the number of installments, the
+    amount in whole reais, since the first installment absorbs the rounding, and
+    the estimated purchase month, so series started in different months stay
+    apart. Purchases whose months were snapped together, or identical purchases
+    made in the same month, are told apart by the k-th occurrence of each
+    installment number.
+    """
+    keys = _group_keys(df)
+    series_keys = [*keys, "totalInstallments", "reais"]
+
+    charges = _charges(df, closing_day)
+    charges = charges[charges["installmentNumber"].notna()]
+    charges["reais"] = np.floor(charges["amount"])
+    charges = charges.sort_values(
+        [*series_keys, "monthIndex", "installmentNumber"], kind="stable"
+    )
+    charges["purchaseMonth"] = _purchase_months(charges, series_keys)
+    charges["purchase"] = charges.groupby(
+        [*series_keys, "purchaseMonth", "installmentNumber"], sort=False
+    ).cumcount()
+    installments = (
+        charges.groupby([*series_keys, "purchaseMonth", "purchase"], sort=False)
+        .agg(
+            amount=("amount", "last"),
+            paidInstallments=("installmentNumber", "max"),
+            lastMonthIndex=("monthIndex", "max"),
+        )
+        .reset_index()
+    )
+    installments["lastYear"], installments["lastMonth"] = _split_month_index(
+        installments["lastMonthIndex"]
+    )
+    return installments[
+        [
+            *keys,
+            "amount",
+            "totalInstallments",
+            "paidInstallments",
+            "lastYear",
+            "lastMonth",
+        ]
+    ]
+
+
+def detect_recurring(
+    df: pd.DataFrame,
+    closing_day: int | None = None,
+    min_occurrences: int = 3,
+    max_amount_variation: float = 0.1,
+) -> pd.DataFrame:
+    """Finds merchants charged once per period with a stable amount.
+
+    A merchant is recurring when it shows up at least min_occurrences times, at
+    most once per billing month, at least 75% of its gaps equal a period in
+    PERIODS, and the amount's coefficient of variation is below
+    max_amount_variation. Installment rows are ignored.
+    """
+    charges = _charges(df, closing_day)
+    charges = charges[charges["installmentNumber"].isna() & (charges["amount"] > 0)]
+
+    keys = _group_keys(df)
+    monthly = (
+        charges.groupby([*keys, "monthIndex"])
+        .agg(amount=("amount", "sum"), count=("amount", "size"))
+        .reset_index()
+    )
+    gaps = monthly.groupby(keys)["monthIndex"].diff()
+    monthly["period"] = gaps.groupby([monthly[key] for key in keys]).transform("median")
+    monthly["regularGap"] = (gaps == monthly["period"]).astype("float64")
+    monthly.loc[gaps.isna(), "regularGap"] = np.nan
+
+    candidates = monthly.groupby(keys).agg(
+        occurrences=("monthIndex", "size"),
+        maxPerMonth=("count", "max"),
+        period=("period", "first"),
+        regularity=("regularGap", "mean"),
+        meanAmount=("amount", "mean"),
+        stdAmount=("amount", "std"),
+        amount=("amount", "last"),
+        lastMonthIndex=("monthIndex", "max"),
+    )
+    is_recurring = (
+        (candidates["occurrences"] >= min_occurrences)
+        & (candidates["maxPerMonth"] == 1)
+        & candidates["period"].isin(PERIODS)
+        & (candidates["regularity"] >= 0.75)
+        & (candidates["stdAmount"] <= max_amount_variation * candidates["meanAmount"])
+    )
+    recurring = candidates.loc[is_recurring].reset_index()
+    recurring["period"] = recurring["period"].astype("int64")
+    recurring["lastYear"], recurring["lastMonth"] = _split_month_index(
+        recurring["lastMonthIndex"]
+    )
+    return recurring[
+        [*keys, "amount", "period", "occurrences", "lastYear", "lastMonth"]
+    ]
+
+
+def _expand(
+    frame: pd.DataFrame, start: np.ndarray, step: np.ndarray, count: np.ndarray
+) -> pd.DataFrame:
+    """Repeats each row count times, at month indexes start, start + step, ..."""
+    count = np.clip(count, 0, None).astype("int64")
+    rows = np.repeat(np.arange(len(frame)), count)
+    offsets = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+    expanded = frame.iloc[rows].reset_index(drop=True)
+    expanded["monthIndex"] = start[rows] + offsets * step[rows]
+    return expanded
+
+
+def project_charges(
+    df: pd.DataFrame, months_ahead: int = 3, closing_day: int | None = None
+) -> pd.DataFrame:
+    """Lists the installments and recurring charges expected in the next bills.
+
+    Covers the open bill, the latest billing month in df, and the months_ahead
+    after it, with the charges that were not posted yet. Recurring charges that
+    already missed a period are considered cancelled.
+    """
+    columns = [*_group_keys(df), "kind", "year", "month", "amount"]
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+
+    dates = aggregates.billing_months(df["date"], closing_day)
+    current = int((dates["year"] * 12 + dates["month"] - 1).max())
+    horizon = current + months_ahead
+
+    installments = detect_installments(df, closing_day)
+    last = (installments["lastYear"] * 12 + installments["lastMonth"] - 1).to_numpy()
+    paid = installments["paidInstallments"].to_numpy(dtype="int64")
+    total = installments["totalInstallments"].to_numpy(dtype="int64")
+    start = np.maximum(last + 1, current)
+    end = np.minimum(last + total - paid, horizon)
+    projected_installments = _expand(
+        installments.assign(kind=primitives.ChargeKind.INSTALLMENT.value),
+        start,
+        np.ones_like(start),
+        end - start + 1,
+    )
+
+    recurring = detect_recurring(df, closing_day)
+    last = (recurring["lastYear"] * 12 + recurring["lastMonth"] - 1).to_numpy()
+    period = recurring["period"].to_numpy()
+    active = last + period >= current
+    recurring, last, period = recurring[active], last[active], period[active]
+    start = last + period
+    projected_recurring = _expand(
+        recurring.assign(kind=primitives.ChargeKind.RECURRING.value),
+        start,
+        period,
+        (horizon - start) // period + 1,
+    )
+
+    projected = pd.concat(
+        [projected_installments, projected_recurring], ignore_index=True
+    )
+    projected["year"], projected["month"] = _split_month_index(projected["monthIndex"])
+    return projected[columns]
+
+
+def project_bills(
+    df: pd.DataFrame, months_ahead: int = 3, closing_day: int | None = None
+) -> pd.Series:
+    """Sums project_charges per card (when present) and billing month."""
+    charges = project_charges(df, months_ahead, closing_day)
+    keys = ["card"] if "card" in charges else []
+    return charges.groupby([*keys, "year", "month"])["amount"].sum()
@@ -1,8 +1,240 @@
+import pandas as pd
 import pytest
+import aggregates as aggregates_lib
+import batch
+import normalization
 import parse_credit_card_lib
 import primitives
+import reconciliation
+import recurring
 import validators
 
 class TestEverythingBuilds:
     def test_build(self):
-        assert True
\ No newline at end of file
+        assert True
+class TestNormalization:
+    def _transactions(self):
+        return pd.DataFrame({
+            'date': pd.to_datetime(['2024-03-01', '2024-03-05', '2024-03-09', '2024-03-09']),
+            'currencyCode': ['BRL', 'USD', 'USD', 'EUR'],
+            'amount': [10.0, 2.0, 2.0, 1.0],
+            'amountInAccountCurrency': [None, None, None, 6.0],
+        })
+
+    def test_normalize_amounts(self, tmp_path):
+        rates_file = tmp_path / 'rates.csv'
+        rates_file.write_text('date,currencyCode,rate\n2024-03-01,USD,4.0\n2024-03-08,USD,5.0\n')
+        df = self._transactions()
+
+        normalization.normalize_amounts(df, normalization.load_fx_rates(str(rates_file)))
+
+        assert df[normalization.ACCOUNT_AMOUNT_COLUMN].tolist() == [10.0, 8.0, 10.0, 6.0]
+        assert parse_credit_card_lib.get_total_by(df, 'currencyCode')['USD'] == 18.0
+
+    def test_normalize_amounts_missing_rate(self):
+        df = self._transactions()
+        fx_rates = pd.DataFrame({'date': pd.to_datetime(['2024-03-10']), 'currencyCode': ['USD'], 'rate': [5.0]})
+        with pytest.raises(ValueError, match='USD'):
+            normalization.normalize_amounts(df, fx_rates)
+
+    def test_missing_currency_code_still_raises_value_error(self):
+        df = pd.DataFrame({
+            'date': pd.to_datetime(['2024-03-01', '2024-03-01']),
+            'currencyCode': [None, 'USD'],
+            'amount': [1.0, 2.0],
+        })
+        fx_rates = pd.DataFrame({'date': pd.to_datetime(['2024-03-10']), 'currencyCode': ['EUR'], 'rate': [5.0]})
+        with pytest.raises(ValueError, match='USD'):
+            normalization.normalize_amounts(df, fx_rates)
+
+    def test_missing_currency_code_is_reported(self):
+        df = pd.DataFrame({'date': pd.to_datetime(['2024-03-01']), 'currencyCode': [None], 'amount': [1.0]})
+        fx_rates = pd.DataFrame({'date': pd.to_datetime(['2024-03-01']), 'currencyCode': ['USD'], 'rate': [5.0]})
+        with pytest.raises(ValueError, match='1 rows without a currency code'):
+            normalization.normalize_amounts(df, fx_rates)
+
+    def test_currency_codes_are_case_insensitive(self):
+        df = pd.DataFrame({'date': pd.to_datetime(['2024-03-01', '2024-03-01']), 'currencyCode': ['brl', 'usd'], 'amount': [1.0, 2.0]})
+        fx_rates = pd.DataFrame({'date': pd.to_datetime(['2024-03-01']), 'currencyCode': ['USD'], 'rate': [5.0]})
+
+        normalization.normalize_amounts(df, fx_rates)
+
+        assert df[normalization.ACCOUNT_AMOUNT_COLUMN].tolist() == [1.0, 10.0]
+
+class TestStatementAggregates:
+    def _transactions(self):
+        return pd.DataFrame({
+            'date': pd.to_datetime(['2024-01-05', '2024-01-20', '2024-01-25', '2024-02-02']),
+            'category': ['transporte', 'casa', 'transporte', 'casa'],
+            'amount': [10.0, 20.0, 5.0, 1.0],
+        })
+
+    def test_totals_by_billing_month(self):
+        aggregates = aggregates_lib.StatementAggregates.from_transactions(self._transactions(), closing_day=15)
+
+        assert aggregates.totals_by_category(primitives.TransactionMonth(2024, 1)) == {'transporte': 10.0}
+        assert aggregates.totals_by_category(primitives.TransactionMonth(2024, 2)) == {'casa': 21.0, 'transporte': 5.0}
+        assert aggregates.months() == [primitives.TransactionMonth(2024, 1), primitives.TransactionMonth(2024, 2)]
+
+    def test_billing_months_use_local_time(self):
+        # 02:36 UTC on Jan 6 is still Jan 5 in Sao Paulo, so it makes the January bill.
+        dates = pd.Series(['2024-01-06T02:36:17Z', '2024-01-06T03:00:00Z'])
+        months = aggregates_lib.billing_months(dates, closing_day=5)
+        assert months.values.tolist() == [[2024, 1], [2024, 2]]
+
+    def test_incremental_updates(self):
+        df = self._transactions()
+        aggregates = aggregates_lib.StatementAggregates()
+        aggregates.append(df.iloc[:2])
+        aggregates.append(df.iloc[2:])
+        aggregates.recategorize(df.iloc[[0]], 'viagem')
+        aggregates.rename_category('casa', 'moradia')
+        january = primitives.TransactionMonth(2024, 1)
+
+        assert aggregates.totals_by_category(january) == {'moradia': 20.0, 'transporte': 5.0, 'viagem': 10.0}
+        assert aggregates.total(january) == 35.0
+
+        aggregates.remove(df.iloc[[1]].assign(category='moradia'))
+        assert 'moradia' not in aggregates.totals_by_category(january)
+
+    def test_failed_remove_changes_nothing(self):
+        df = self._transactions()
+        aggregates = aggregates_lib.StatementAggregates.from_transactions(df.iloc[:3])
+
+        with pytest.raises(ValueError):
+            aggregates.remove(df.iloc[[0, 3]])
+
+        assert aggregates.months() == [primitives.TransactionMonth(2024, 1)]
+        assert aggregates.total(primitives.TransactionMonth(2024, 1)) == 35.0
+
+class TestReconciliation:
+    def test_normalize_titles(self):
+        titles = pd.Series(['Aliexpress 1/2', 'Loja - Parcela 3 de 10', 'Café São', 'Uber *Uber *Trip', 'Posto 24/7', 'Loja 12/03', 'Loja 0/3'])
+        assert reconciliation.normalize_titles(titles).tolist() == [
+            'aliexpress', 'loja', 'cafe sao', 'uber uber trip', 'posto 24 7', 'loja 12 03', 'loja 0 3',
+        ]
+        installments = reconciliation.parse_installments(titles)
+        assert installments['installmentNumber'].tolist()[:2] == [1, 3]
+        assert installments.iloc[2:].isna().all(axis=None)
+
+    def test_merge_overlapping_sources(self):
+        api = pd.DataFrame({
+            'date': ['2024-01-05T03:00:00.000Z', '2024-01-05T03:00:00.000Z', '2024-01-29T03:00:00.000Z'],
+            'description': ['Uber *Uber *Trip', 'Uber *Uber *Trip', 'Pg *Genio Desks 4/8'],
+            'amount': [19.95, 19.95, 581.42],
+        })
+        statement = pd.DataFrame({
+            'date': ['2024-01-05', '2024-01-05', '2024-01-05', '2024-02-02', '2024-01-06'],
+            'title': ['Uber *Uber *Trip', 'Uber *Uber *Trip', 'Uber *Uber *Trip', 'Pg *Genio Desks - Parcela 4/8', 'Ifood'],
+            'amount': [19.95, 19.95, 19.95, 581.42, 30.0],
+        })
+
+        merged = reconciliation.merge_transactions(api, statement)
+
+        assert merged[reconciliation.SOURCE_COLUMN].tolist() == [0, 0, 0, 1, 1]
+        assert merged['title'].dropna().tolist() == ['Uber *Uber *Trip', 'Ifood']
+
+    def test_repeat_installment_purchase_is_kept(self):
+        first = pd.DataFrame({'date': ['2023-09-10'], 'title': ['Aliexpress 1/2'], 'amount': [36.86]})
+        later = pd.DataFrame({'date': ['2024-03-10'], 'title': ['Aliexpress 1/2'], 'amount': [36.86]})
+
+        assert len(reconciliation.merge_transactions(first, later)) == 2
+        assert len(reconciliation.merge_transactions(first, first)) == 1
+
+    def test_installment_tolerance_does_not_chain(self):
+        yearly = pd.DataFrame({'date': [f'2024-{month:02}-10' for month in range(1, 13)], 'title': 'Loja 1/3', 'amount': 50.0})
+        later = pd.DataFrame({'date': ['2024-12-10', '2025-01-10'], 'title': 'Loja 1/3', 'amount': 50.0})
+
+        assert len(reconciliation.merge_transactions(yearly, later)) == 13
+
+    def test_purchases_a_month_apart_across_sources_are_kept_once(self):
+        # The price of tolerating closing-date rounding between sources.
+        january = pd.DataFrame({'date': ['2024-01-10'], 'title': ['Loja 1/3'], 'amount': [50.0]})
+        february = pd.DataFrame({'date': ['2024-02-10'], 'title': ['Loja 1/3'], 'amount': [50.0]})
+
+        assert len(reconciliation.merge_transactions(january, february)) == 1
+        assert len(reconciliation.merge_transactions(pd.concat([january, february]))) == 2
+
+class TestRecurring:
+    def _transactions(self):
+        return pd.DataFrame({
+            'date': pd.to_datetime(['2024-01-05', '2024-02-05', '2024-03-05', '2024-01-10', '2024-02-10', '2024-03-10', '2024-03-12']),
+            'title': ['Google Storage', 'Google Storage', 'Google Storage', 'Loja 1/4', 'Loja 2/4', 'Loja 3/4', 'Uber *Trip'],
+            'amount': [7.99, 7.99, 7.99, 25.03, 25.0, 25.0, 12.0],
+        })
+
+    def test_detect(self):
+        df = self._transactions()
+
+        installments = recurring.detect_installments(df)
+        assert installments[['merchant', 'amount', 'paidInstallments']].values.tolist() == [['loja', 25.0, 3]]
+        assert recurring.detect_recurring(df)['merchant'].tolist() == ['google storage']
+
+    def test_project_bills(self):
+        bills = recurring.project_bills(self._transactions(), months_ahead=2)
+        assert bills.round(2).to_dict() == {(2024, 4): 32.99, (2024, 5): 7.99}
+
+    def test_staggered_installment_series(self):
+        df = pd.DataFrame({
+            'date': pd.to_datetime(['2024-01-10', '2024-01-10', '2024-02-10', '2024-02-10']),
+            'title': ['Loja 3/4', 'Loja 1/4', 'Loja 4/4', 'Loja 2/4'],
+            'amount': [25.0, 25.0, 25.0, 25.0],
+        })
+
+        installments = recurring.detect_installments(df)
+        assert sorted(installments['paidInstallments'].tolist()) == [2, 4]
+        assert recurring.project_bills(df, months_ahead=2).to_dict() == {(2024, 3): 25.0, (2024, 4): 25.0}
+
+    def test_installment_posted_in_the_purchase_bill(self):
+        # The 2nd installment is posted on the closing date, sometimes in the same bill as the 1st.
+        df = pd.DataFrame({
+            'date': pd.to_datetime(['2024-01-15', '2024-01-28', '2024-02-27', '2024-03-10']),
+            'title': ['Loja 1/4', 'Loja 2/4', 'Loja 3/4', 'Loja 1/4'],
+            'amount': [25.0, 25.0, 25.0, 25.0],
+        })
+
+        installments = recurring.detect_installments(df)
+        assert installments['paidInstallments'].tolist() == [3, 1]
+
+    def test_anticipated_installments(self):
+        df = pd.DataFrame({
+            'date': pd.to_datetime(['2024-01-10', '2024-02-10', '2024-02-10', '2024-02-10']),
+            'title': ['Loja 1/4', 'Loja 2/4', 'Loja 3/4', 'Loja 4/4'],
+            'amount': [25.0, 25.0, 25.0, 25.0],
+        })
+
+        installments = recurring.detect_installments(df)
+        assert installments['paidInstallments'].tolist() == [4]
+        assert recurring.project_bills(df).empty
+
+class TestBatch:
+    def test_run_batch(self, tmp_path):
+        (tmp_path / 'ana').mkdir()
+        (tmp_path / 'ana' / '2024_01.csv').write_text('date,category,title,amount\n2024-01-05,transporte,Uber,10.0\n')
+        (tmp_path / 'ana' / '2024_02.csv').write_text('date,category,title,amount\n2024-02-05,transporte,Uber,5.0\n')
+        (tmp_path / 'bia.csv').write_text('date,category,title,amount,card\n2024-01-07,mercado,Epa,20.0,1111\n2024-01-08,mercado,Epa,1.0,2222\n')
+        done = []
+
+        result = batch.run_batch(
+            tmp_path, category_mapping={'mercado': 'casa'}, chunk_size=1, max_workers=2,
+            on_shard_done=lambda shard, count, total: done.append((count, total)),
+        )
+
+        assert [(shard.user, shard.rows) for shard in result.shards] == [('ana', 2), ('bia', 2)]
+        assert done == [(1, 2), (2, 2)]
+        assert result.failed == []
+        assert result.totals[['user', 'card', 'month', 'category', 'amount']].values.tolist() == [
+            ['ana', '', 1, 'transporte', 10.0], ['ana', '', 2, 'transporte', 5.0],
+            ['bia', '1111', 1, 'casa', 20.0], ['bia', '2222', 1, 'casa', 1.0],
+        ]
+
+    def test_failed_shard_does_not_abort_the_batch(self, tmp_path):
+        (tmp_path / 'ana.csv').write_text('date,category,title,amount,currencyCode\n2024-01-05,transporte,Uber,10.0,BRL\n')
+        (tmp_path / 'bia.csv').write_text('date,category,title,amount,currencyCode\n2024-01-07,viagem,Hotel,20.0,USD\n')
+
+        result = batch.run_batch(tmp_path, max_workers=1)
+
+        assert [shard.user for shard in result.shards] == ['ana']
+        assert [failed.user for failed in result.failed] == ['bia']
+        assert isinstance(result.failed[0].error, ValueError)
+        assert result.totals['user'].tolist() == ['ana']
@@ -1,13 +1,106 @@
 import dataclasses
+import functools
 import json
+import pathlib
+import sys
+import types
+from typing import Mapping
 
-@dataclasses.dataclass
+import pandas as pd
+
+_CURRENCIES_FILE = pathlib.Path(__file__).with_name("currencies.json")
+
+
+@dataclasses.dataclass(frozen=True)
 class Currency:
-    cc:str
+    cc: str
     symbol: str
     name: str
 
-def _get_currencies():
-    with open('/home/valeriaps/PluggyTests/src/financial_assets/currencies.json') as f:
-        json.load(f)
-    return json.loads('/home/valeriaps/PluggyTests/src/financial_assets/currencies.json')
+
+@functools.cache
+def _get_currencies() -> Mapping[str, Currency]:
+    """Loads the currency table on first use and keeps it for the whole process."""
+    with open(_CURRENCIES_FILE, encoding="utf-8") as f:
+        raw_currencies = json.load(f)
+
+    currencies = {}
+    for raw_currency in raw_currencies:
+        cc = sys.intern(raw_currency["cc"])
+        currencies[cc] = Currency(cc, raw_currency["symbol"], raw_currency["name"])
+    return types.MappingProxyType(currencies)
+
+
+def get_currency(cc: str) -> Currency:
+    try:
+        return _get_currencies()[cc.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown currency code: {cc}") from None
+
+
+def is_currency(cc: str) -> bool:
+    return isinstance(cc, str) and cc.upper() in _get_currencies()
+
+
+@functools.cache
+def load_rates(file_path: str) -> Mapping[str, float]:
+    """Loads a rate table once per file.
+
+    The file is a JSON object mapping ISO codes to the value of one unit of that
+    currency in the target currency, e.g. {"BRL": 1.0, "USD": 4.97}.
+    """
+    with open(file_path, encoding="utf-8") as f:
+        raw_rates = json.load(f)
+    return types.MappingProxyType(
+        {get_currency(cc).cc: float(rate) for cc, rate in raw_rates.items()}
+    )
+
+
+def normalize_codes(currency_codes: pd.Series) -> pd.Series:
+    """Upper-cases ISO codes, like get_currency does, and rejects unknown ones.
+
+    Missing codes stay NA, check_rates reports them when they need a rate.
+    """
+    codes = currency_codes.astype("string").str.strip().str.upper()
+    unknown = sorted(
+        cc for cc in codes.dropna().unique() if cc not in _get_currencies()
+    )
+    if unknown:
+        raise ValueError(f"Unknown currency codes: {', '.join(unknown)}")
+    return codes.astype(object)
+
+
+def check_rates(currency_codes: pd.Series, row_rates: pd.Series) -> None:
+    """Raises ValueError naming the codes without a rate and counting the rows
+    without a currency code, so neither is silently summed as NaN."""
+    missing = row_rates.isna()
+    if not missing.any():
+        return
+
+    missing_codes = currency_codes[missing]
+    problems = []
+    if missing_codes.notna().any():
+        codes = sorted(missing_codes.dropna().unique().astype(str))
+        problems.append(f"no rate for currencies {', '.join(codes)}")
+    if missing_codes.isna().any():
+        problems.append(f"{missing_codes.isna().sum()} rows without a currency code")
+    raise ValueError(f"Cannot convert amounts: {'; '.join(problems)}")
+
+
+def convert_amounts(
+    df: pd.DataFrame,
+    rates: Mapping[str, float],
+    amount_column: str = "amount",
+    currency_column: str = "currencyCode",
+) -> pd.Series:
+    """Converts every amount to the rates' target currency in a single pass.
+
+    rates is keyed by upper-case ISO codes, as load_rates returns it. Every row
+    with an amount needs a known currency code with a rate.
+    """
+    currency_codes = normalize_codes(df[currency_column])
+    row_rates = currency_codes.map(pd.Series(rates, dtype="float64"))
+
+    has_amount = df[amount_column].notna()
+    check_rates(currency_codes[has_amount], row_rates[has_amount])
+    return df[amount_column] * row_rates
@@ -1,6 +1,46 @@
+import json
+
+import pandas as pd
 import pytest
-import currencies
+from financial_assets import currencies
 
 class TestEverythingBuilds:
     def test_build(self):
-        assert True
\ No newline at end of file
+        assert True
+
+class TestCurrencies:
+    def test_lookup_is_cached(self):
+        assert currencies.get_currency("brl") is currencies.get_currency("BRL")
+        assert currencies.get_currency("USD").name == "United States dollar"
+
+    def test_unknown_currency(self):
+        assert not currencies.is_currency("XXX")
+        with pytest.raises(ValueError):
+            currencies.get_currency("XXX")
+
+    def test_convert_amounts(self, tmp_path):
+        rates_file = tmp_path / "rates.json"
+        rates_file.write_text(json.dumps({"BRL": 1.0, "USD": 5.0}))
+        rates = currencies.load_rates(str(rates_file))
+        df = pd.DataFrame({"currencyCode": ["BRL", "USD"], "amount": [10.0, 2.0]})
+
+        assert currencies.convert_amounts(df, rates).tolist() == [10.0, 10.0]
+
+    def test_convert_amounts_missing_rate(self):
+        df = pd.DataFrame({"currencyCode": ["EUR"], "amount": [1.0]})
+        with pytest.raises(ValueError, match="EUR"):
+            currencies.convert_amounts(df, {"BRL": 1.0})
+
+    def test_convert_amounts_normalizes_codes(self):
+        df = pd.DataFrame({"currencyCode": ["usd", " brl"], "amount": [2.0, 1.0]})
+        assert currencies.convert_amounts(df, {"BRL": 1.0, "USD": 5.0}).tolist() == [10.0, 1.0]
+
+    def test_convert_amounts_missing_code(self):
+        df = pd.DataFrame({"currencyCode": [None, "USD"], "amount": [1.0, 2.0]})
+        with pytest.raises(ValueError, match="1 rows without a currency code"):
+            currencies.convert_amounts(df, {"BRL": 1.0, "USD": 5.0})
+
+    def test_convert_amounts_unknown_code(self):
+        df = pd.DataFrame({"currencyCode": ["XXX"], "amount": [1.0]})
+        with pytest.raises(ValueError, match="Unknown currency codes: XXX"):
+            currencies.convert_amounts(df, {"BRL": 1.0})